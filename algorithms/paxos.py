@@ -47,59 +47,104 @@ MUST use the value from the highest-numbered previous proposal. This ensures
 that once a value starts being accepted, all future proposals use that value.
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+import asyncio
+import json
+import logging
+import os
+import sys
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union, Any
 from dataclasses import dataclass
 
-@dataclass
-class Message:
+# Protocol tracing goes through logging at DEBUG level, so the message
+# formatting is skipped entirely unless a handler is enabled for it.
+# The demos at the bottom of this file turn it on (see __main__).
+logger = logging.getLogger(__name__)
+
+# Round-level log templates shared by propose() and propose_batch().
+# Kept at module scope and formatted lazily by logging; the calls that
+# need extra work to build their arguments (unpacking proposal numbers,
+# counting slots) sit behind one isEnabledFor() check per round instead.
+_EMOJI_TEMPL_START = "🏛️  %s: Starting Paxos round to propose '%s'"
+_EMOJI_TEMPL_START_BATCH = "🏛️  %s: Starting batched Paxos round for slots [%s, %s)"
+_TEMPL_PROPOSAL_NUM = "   📊 Proposal number: (%d.%d) | Majority needed: %s/%s"
+_TEMPL_PHASE1_FAILED = "   ❌ PHASE 1 FAILED: Only %s/%s promises received"
+
+# === PROTOCOL REPLIES ===
+# Requests (PREPARE, ACCEPT) are plain method calls on the acceptor, with the
+# proposal number and value as arguments. Replies are the small named tuples
+# below, carrying only the fields the proposer reads; a rejection is None.
+
+class Promise(NamedTuple):
     """
-    Represents a message in the Paxos protocol.
-    
-    Fields:
-    - msg_type: Type of message (PREPARE, PROMISE, ACCEPT, ACCEPTED)
-    - sender: ID of the node sending the message
-    - receiver: ID of the node receiving the message  
-    - proposal_num: Unique proposal number for ordering
-    - value: The value being proposed (for ACCEPT messages)
-    - prev_accepted: Previously accepted proposal info (for PROMISE messages)
+    PROMISE reply (Phase 1b): the acceptor's id and what it accepted before.
+    
+    - prev_accepted: (proposal_num, value) or None for a single-decree
+      prepare(); {slot: (proposal_num, value)} for a batched prepare_range()
+    """
+    sender: int
+    prev_accepted: Any = None
+
+class Accepted(NamedTuple):
+    """
+    ACCEPTED reply (Phase 2b): the acceptor's id and the accepted value.
+    
+    - value: the value for accept(); for accept_batch() a bitmask of the
+      accepted slots, bit i = i-th (slot, value) pair of the request
     """
-    msg_type: str  # PREPARE, PROMISE, ACCEPT, ACCEPTED
     sender: int
-    receiver: int
-    proposal_num: int
     value: Any = None
-    prev_accepted: Tuple[int, Any] = None
 
-class ProposalNumber:
+@dataclass(frozen=True, slots=True)
+class QuorumConfig:
     """
-    Proposal number with format (sequence, node_id) for total ordering.
+    Quorum sizes for a cluster of `size` acceptors, computed once.
     
-    This ensures that:
-    1. Each proposal has a unique, globally ordered number
-    2. Higher sequence numbers take priority
-    3. Node ID breaks ties for same sequence numbers
-    4. No two proposers can generate the same proposal number
+    - majority: classic Paxos quorum, size // 2 + 1. Any two majorities
+      overlap in at least one acceptor, which is what makes Paxos safe.
+    - fast_quorum: Fast Paxos quorum, ceil(3 * size / 4). Larger, because a
+      fast round skips the leader and must still intersect any two quorums.
     
-    Example: (3, 1) < (3, 2) < (4, 1) < (4, 2)
+    Build it once per cluster with QuorumConfig.for_size(len(acceptors)) and
+    hand the same object to every propose() / get_consensus() call.
     """
-
-    def __init__(self, seq: int, node_id: int):
-        self.seq = seq        # Incrementing sequence number
-        self.node_id = node_id # Unique node identifier
-
-    def __lt__(self, other):
-        return (self.seq, self.node_id) < (other.seq, other.node_id)
-    def __le__(self, other):
-        return (self.seq, self.node_id) <= (other.seq, other.node_id)
-    def __gt__(self, other):
-        return (self.seq, self.node_id) > (other.seq, other.node_id)
-    def __ge__(self, other):
-        return (self.seq, self.node_id) >= (other.seq, other.node_id)
-    def __eq__(self, other):
-        return (self.seq, self.node_id) == (other.seq, other.node_id)
-
-    def __str__(self):
-        return f"({self.seq}.{self.node_id})"
+    size: int
+    majority: int
+    fast_quorum: int
+
+    @classmethod
+    def for_size(cls, size: int) -> 'QuorumConfig':
+        return cls(size, size // 2 + 1, size - size // 4)
+
+# === PROPOSAL NUMBERS ===
+# A proposal number is the pair (sequence, node_id), packed into one int:
+#
+#     proposal_num = (seq << 32) | node_id
+#
+# This ensures that:
+# 1. Each proposal has a unique, globally ordered number
+# 2. Higher sequence numbers take priority (they live in the high bits)
+# 3. Node ID breaks ties for same sequence numbers (low 32 bits)
+# 4. No two proposers can generate the same proposal number
+#
+# Example: (3, 1) < (3, 2) < (4, 1) < (4, 2)
+#
+# Acceptors compare proposal numbers on every PREPARE and ACCEPT; as plain
+# ints that is one C-level comparison instead of a Python __gt__ call that
+# builds two tuples. Node IDs must fit in 32 bits.
+
+NODE_ID_BITS = 32
+NODE_ID_MASK = (1 << NODE_ID_BITS) - 1
+
+
+def pack_pn(seq: int, node_id: int) -> int:
+    """Pack (sequence, node_id) into a single comparable proposal number."""
+    return (seq << NODE_ID_BITS) | node_id
+
+
+def unpack_pn(proposal_num: int) -> Tuple[int, int]:
+    """Split a proposal number back into (sequence, node_id), e.g. for display."""
+    return proposal_num >> NODE_ID_BITS, proposal_num & NODE_ID_MASK
 
 class Proposer:
     """
@@ -116,6 +161,15 @@ class Proposer:
     - node_id: Unique identifier for this proposer
     - seq: Sequence counter for generating unique proposal numbers
     - name: Human-readable name for logging/debugging
+    - next_slot: Next free log slot for propose_batch() (Multi-Paxos)
+    - unchosen: {slot: value} for claimed slots no round has filled yet
+      (see retry_unchosen)
+    - _fast_round: Proposal number of the fast round this proposer has opened
+      and not yet used (open_fast_round / propose_fast), or None
+    
+    ROUND NUMBERING:
+    Classic rounds use odd sequence numbers, fast rounds even ones, so any
+    proposal number tells which kind of round it belongs to.
     
     PAXOS PHASES FROM PROPOSER PERSPECTIVE:
     
@@ -134,12 +188,29 @@ class Proposer:
     - If not, may need to retry entire process
     """
 
+    __slots__ = ('node_id', 'name', 'seq', 'next_slot', 'unchosen', '_fast_round')
+
+    # Seconds a phase may wait for its quorum before giving up (None = forever).
+    # Without it, a round with too few live acceptors would never return.
+    ROUND_TIMEOUT: Optional[float] = 5.0
+
     def __init__(self, node_id: int, name: str = ""):
         self.node_id = node_id
         self.name = name or f"Node-{node_id}"
         self.seq = 0  # Sequence counter for unique proposal numbers
+        self.next_slot = 0  # Next log slot claimed by propose_batch()
+        self.unchosen = {}  # slot -> our value, for claimed slots still without a chosen value
+        self._fast_round = None  # Open fast round (proposal number), see propose_fast()
 
-    def propose(self, value: Any, acceptors: List['Acceptor']) -> Optional[Any]:
+    def _next_proposal_num(self, fast: bool = False) -> int:
+        """Advance seq to the next odd (classic) or even (fast) value and pack it."""
+        self.seq += 1
+        if (self.seq % 2 == 0) != fast:
+            self.seq += 1
+        return pack_pn(self.seq, self.node_id)
+
+    async def propose(self, value: Any, acceptors: List['Acceptor'],
+                      quorum: Optional[QuorumConfig] = None) -> Optional[Any]:
         """
         Run complete Paxos consensus round.
         
@@ -150,120 +221,467 @@ class Proposer:
         4. Check if majority of acceptors accepted
         5. Return consensus value if successful, None if failed
         
+        CONCURRENT DISPATCH:
+        Each phase sends its requests to all acceptors at once instead of one
+        after another, and moves on as soon as a majority has replied
+        (see _await_quorum). A phase then costs the round-trip of the
+        majority-th fastest acceptor, so one slow replica does not hold the
+        round up. An acceptor that raises counts as a missing reply.
+        Use propose_sync() from non-async code.
+        
         Args:
             value: The value this proposer wants to achieve consensus on
             acceptors: List of acceptor nodes to send messages to
+            quorum: Precomputed quorum sizes for this cluster (derived from
+                len(acceptors) when omitted)
             
         Returns:
             The consensus value if achieved, None if consensus failed
         """
+        if quorum is None:
+            quorum = QuorumConfig.for_size(len(acceptors))
+
         # Generate unique, monotonically increasing proposal number
-        self.seq += 1
-        proposal_num = ProposalNumber(self.seq, self.node_id)
-        majority = len(acceptors) // 2 + 1
+        proposal_num = self._next_proposal_num()
+        majority = quorum.majority
 
-        print(f"🏛️  {self.name}: Starting Paxos round to propose '{value}'")
-        print(f"   📊 Proposal number: {proposal_num} | Majority needed: {majority}/{len(acceptors)}")
+        debug = logger.isEnabledFor(logging.DEBUG)
 
-        # === PHASE 1: PREPARE ===
-        print(f"   📤 PHASE 1: Sending PREPARE({proposal_num}) to all acceptors")
-        promises = []
+        if debug:
+            logger.debug(_EMOJI_TEMPL_START, self.name, value)
+            logger.debug(_TEMPL_PROPOSAL_NUM, *unpack_pn(proposal_num), majority, quorum.size)
 
-        for acceptor in acceptors:
-            response = acceptor.prepare(proposal_num)
-            if response:
-                promises.append(response)
+        # === PHASE 1: PREPARE ===
+        if debug:
+            logger.debug("   📤 PHASE 1: Sending PREPARE((%d.%d)) to all acceptors", *unpack_pn(proposal_num))
+        # The Paxos constraint is folded in as each promise arrives, so the
+        # decision is ready the moment the quorum is
+        constraint = PaxosConstraint(value)
+        promises = await self._await_quorum(
+            (acceptor.prepare_async(proposal_num) for acceptor in acceptors), majority,
+            on_reply=constraint.observe)
 
         # Check if we got majority promises
         if len(promises) < majority:
-            print(f"   ❌ PHASE 1 FAILED: Only {len(promises)}/{majority} promises received")
-            print(f"      Reason: Not enough acceptors promised to support this proposal")
+            logger.debug(_TEMPL_PHASE1_FAILED, len(promises), majority)
+            logger.debug("      Reason: Not enough acceptors promised to support this proposal")
             return None
 
-        print(f"   ✅ PHASE 1 SUCCESS: {len(promises)}/{len(acceptors)} promises received")
+        logger.debug("   ✅ PHASE 1 SUCCESS: %s/%s promises received", len(promises), quorum.size)
+        promising_ids = {p.sender for p in promises}
 
         # === DETERMINE VALUE TO PROPOSE ===
         # This is the critical Paxos constraint implementation
-        final_value = self._choose_value_following_paxos_constraint(value, promises)
+        final_value = constraint.value()
 
-        if final_value != value:
-            print(f"   🔄 PAXOS CONSTRAINT APPLIED:")
-            print(f"      Original proposal: '{value}'")
-            print(f"      Must use existing: '{final_value}'")
-            print(f"      Reason: Acceptor(s) already accepted a value in previous round")
+        if final_value != value and debug:
+            logger.debug("   🔄 PAXOS CONSTRAINT APPLIED:")
+            logger.debug("      Original proposal: '%s'", value)
+            logger.debug("      Must use existing: '%s'", final_value)
+            logger.debug("      Reason: Acceptor(s) already accepted a value in previous round")
 
         # === PHASE 2: ACCEPT ===
-        print(f"   📤 PHASE 2: Sending ACCEPT({proposal_num}, '{final_value}') to promising acceptors")
-        accepts = []
-
-        for acceptor in acceptors:
-            # Only send to acceptors who promised in Phase 1
-            if acceptor.node_id in [p.sender for p in promises]:
-                response = acceptor.accept(proposal_num, final_value)
-                if response:
-                    accepts.append(response)
+        if debug:
+            logger.debug("   📤 PHASE 2: Sending ACCEPT((%d.%d), '%s') to promising acceptors",
+                         *unpack_pn(proposal_num), final_value)
+        # Only send to acceptors who promised in Phase 1
+        promising = [acceptor for acceptor in acceptors if acceptor.node_id in promising_ids]
+        accepts = await self._await_quorum(
+            (acceptor.accept_async(proposal_num, final_value) for acceptor in promising),
+            majority)
 
         # Check if we got majority accepts
         if len(accepts) >= majority:
-            print(f"   🎉 CONSENSUS ACHIEVED!")
-            print(f"      Final value: '{final_value}'")
-            print(f"      Votes received: {len(accepts)}/{len(acceptors)} acceptors")
-            print(f"      Paxos guarantees: This value is now immutable across the system")
+            if debug:
+                logger.debug("   🎉 CONSENSUS ACHIEVED!")
+                logger.debug("      Final value: '%s'", final_value)
+                logger.debug("      Votes received: %s/%s acceptors", len(accepts), quorum.size)
+                logger.debug("      Paxos guarantees: This value is now immutable across the system")
             return final_value
         else:
-            print(f"   ❌ PHASE 2 FAILED: Only {len(accepts)}/{majority} accepts received")
-            print(f"      Possible reasons: Network issues, acceptor failures, or competing proposals")
+            logger.debug("   ❌ PHASE 2 FAILED: Only %s/%s accepts received", len(accepts), majority)
+            logger.debug("      Possible reasons: Network issues, acceptor failures, or competing proposals")
             return None
 
-    def _choose_value_following_paxos_constraint(self, original_value: Any, promises: List[Message]) -> Any:
+    @staticmethod
+    async def _safe(request) -> Any:
         """
-        Implement the core Paxos safety constraint.
+        Await one acceptor RPC, turning an expected failure into "no reply".
         
-        PAXOS SAFETY RULE:
-        If any acceptor in Phase 1 returns a previously accepted value,
-        the proposer MUST use the value from the highest-numbered proposal.
+        In a majority-quorum protocol unreachable or slow acceptors are
+        normal, not exceptional: they are simply not counted, so the task
+        finishes with None instead of storing an exception for the caller.
+        """
+        try:
+            return await request
+        except (TimeoutError, ConnectionError):
+            return None
+
+    @classmethod
+    async def _await_quorum(cls, requests, majority: int, on_reply=None) -> list:
+        """
+        Send all requests concurrently and return once a majority has replied.
+        
+        EARLY-QUORUM RETURN:
+        1. Start every request as a task (wrapped in _safe)
+        2. Wait for whichever finishes first, collect it if it is a reply
+        3. Stop as soon as `majority` replies are in, nothing is pending,
+           or ROUND_TIMEOUT has passed
+        4. Cancel the stragglers - their answers can no longer change the outcome
         
-        This rule ensures that:
-        1. Once a value starts being accepted, all future proposals use that value
-        2. No two different values can ever be chosen
-        3. The system maintains consistency even with concurrent proposers
+        Safety is unaffected: Paxos only ever needs *a* majority, and an
+        acceptor whose reply is dropped is indistinguishable from a slow one.
+        Failed requests (None or an exception) are simply not counted.
+        `on_reply`, if given, is called with each counted reply as it arrives.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if cls.ROUND_TIMEOUT is None else loop.time() + cls.ROUND_TIMEOUT
+        pending = {asyncio.ensure_future(cls._safe(request)) for request in requests}
+        replies = []
+        try:
+            while pending and len(replies) < majority:
+                remaining = None if deadline is None else deadline - loop.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        # Expected failures were already turned into None by _safe;
+                        # anything else (e.g. a failed fsync) is a bug or an outage
+                        # worth seeing. It is still not counted.
+                        logger.warning("   ⚠️  Acceptor request failed: %r", task.exception())
+                        continue
+                    reply = task.result()
+                    if reply:
+                        replies.append(reply)
+                        if on_reply is not None:
+                            on_reply(reply)
+        finally:
+            for task in pending:
+                task.cancel()
+        return replies
+
+    def propose_sync(self, value: Any, acceptors: List['Acceptor'],
+                     quorum: Optional[QuorumConfig] = None) -> Optional[Any]:
+        """
+        Run propose() from synchronous code, on a fresh event loop.
         
-        WHY THIS RULE EXISTS:
-        Without this rule, two proposers could choose different values:
-        - Proposer A gets promises, proposes "Value X"  
-        - Proposer B gets promises, proposes "Value Y"
-        - Result: Inconsistent state!
+        propose_batch_sync() and propose_fast_sync() do the same for
+        propose_batch() and propose_fast().
+        """
+        return asyncio.run(self.propose(value, acceptors, quorum))
+
+    async def propose_batch(self, values: List[Any], acceptors: List['Acceptor'],
+                            quorum: Optional[QuorumConfig] = None,
+                            first_slot: Optional[int] = None) -> List[Optional[Any]]:
+        """
+        Choose many values in one round (Multi-Paxos batching).
         
-        WITH this rule:
-        - Proposer A gets promises, proposes "Value X", some acceptors accept
-        - Proposer B gets promises, learns about "Value X", must propose "Value X"  
-        - Result: Consistent state - both chose "Value X"
+        propose() pays two round-trips per value. A replicated log does not
+        need that: one Phase 1 can reserve a whole range of log slots, and one
+        Phase 2 message can carry every (slot, value) pair under the same
+        proposal number.
+        
+        STEP-BY-STEP:
+        1. Claim slots [next_slot, next_slot + len(values)) with one proposal
+           number (or reuse [first_slot, ...) when retrying)
+        2. Phase 1: one PREPARE for the whole range (Acceptor.prepare_range)
+        3. Per slot, apply the Paxos constraint: a previously accepted value
+           with the highest proposal number wins over ours
+        4. Phase 2: one ACCEPT carrying all slots (Acceptor.accept_batch);
+           each ACCEPTED reply is a bitmask of the slots it accepted
+        5. A slot is chosen when a majority of replies have its bit set
+        
+        HOLES IN THE LOG:
+        Slots are claimed before Phase 1 (that is what lets several rounds run
+        concurrently, see propose_pipelined), so a failed round or slot leaves
+        a hole. Such slots are recorded in `unchosen` and are never handed
+        out again; retry_unchosen() proposes them again until they are filled.
+        A retry may come back with another proposer's value: the Paxos
+        constraint makes it adopt whatever a minority had already accepted.
         
         Args:
-            original_value: The value this proposer originally wanted to propose
-            promises: List of PROMISE messages from acceptors in Phase 1
+            values: Values to place in consecutive log slots
+            acceptors: List of acceptor nodes to send messages to
+            quorum: Precomputed quorum sizes (derived from len(acceptors) when omitted)
+            first_slot: Propose into [first_slot, first_slot + len(values))
+                instead of claiming new slots (used by retry_unchosen)
             
         Returns:
-            The value that must be used in Phase 2 (may be different from original)
+            One entry per slot: the chosen value, or None if that slot failed
         """
-        highest_proposal_num = -1
-        highest_accepted_value = None
+        if not values:
+            return []
+        if quorum is None:
+            quorum = QuorumConfig.for_size(len(acceptors))
+
+        proposal_num = self._next_proposal_num()
+        majority = quorum.majority
+        if first_slot is None:
+            lo = self.next_slot
+            self.next_slot = lo + len(values)
+        else:
+            lo = first_slot
+        hi = lo + len(values)
 
-        # Examine all promises to find highest-numbered previously accepted value
-        for promise in promises:
-            if promise.prev_accepted is not None:
-                prev_proposal_num, prev_value = promise.prev_accepted
+        debug = logger.isEnabledFor(logging.DEBUG)
 
-                if prev_proposal_num > highest_proposal_num:
-                    highest_proposal_num = prev_proposal_num
-                    highest_accepted_value = prev_value
+        if debug:
+            logger.debug(_EMOJI_TEMPL_START_BATCH, self.name, lo, hi)
+            logger.debug(_TEMPL_PROPOSAL_NUM, *unpack_pn(proposal_num), majority, quorum.size)
 
-        # Apply Paxos constraint: use highest previous value if any exists
-        if highest_accepted_value is not None:
-            return highest_accepted_value
-        else:
+        # === PHASE 1: one PREPARE for the whole slot range ===
+        promises = await self._await_quorum(
+            (acceptor.prepare_range_async(proposal_num, lo, hi) for acceptor in acceptors), majority)
+        if len(promises) < majority:
+            logger.debug(_TEMPL_PHASE1_FAILED, len(promises), majority)
+            self.unchosen.update(zip(range(lo, hi), values))
+            return [None] * len(values)
+
+        # === PAXOS CONSTRAINT, slot by slot ===
+        slot_values = []
+        for slot, value in zip(range(lo, hi), values):
+            highest_pn = -1
+            for promise in promises:
+                prev = promise.prev_accepted.get(slot)
+                if prev is not None and prev[0] > highest_pn:
+                    highest_pn, value = prev
+            slot_values.append((slot, value))
+
+        # === PHASE 2: one ACCEPT carrying every (slot, value) ===
+        if debug:
+            logger.debug("   📤 PHASE 2: Sending ACCEPT((%d.%d)) for %s slots", *unpack_pn(proposal_num), len(slot_values))
+        promising_ids = {p.sender for p in promises}
+        accepts = await self._await_quorum(
+            (acceptor.accept_batch_async(proposal_num, slot_values) for acceptor in acceptors
+             if acceptor.node_id in promising_ids),
+            majority)
+
+        chosen = []
+        for offset, ((slot, value), wanted) in enumerate(zip(slot_values, values)):
+            votes = sum(1 for reply in accepts if reply.value >> offset & 1)
+            if votes >= majority:
+                chosen.append(value)
+                self.unchosen.pop(slot, None)
+            else:
+                chosen.append(None)
+                self.unchosen[slot] = wanted
+
+        if debug:
+            committed = sum(1 for value in chosen if value is not None)
+            logger.debug("   %s BATCH RESULT: %d/%d slots chosen",
+                         '🎉' if committed == len(chosen) else '⚠️ ', committed, len(chosen))
+        return chosen
+
+    async def retry_unchosen(self, acceptors: List['Acceptor'],
+                             quorum: Optional[QuorumConfig] = None) -> Dict[int, Optional[Any]]:
+        """
+        Propose every slot in `unchosen` again, one round per contiguous run.
+        
+        Returns:
+            {slot: chosen value, or None if it is still open}
+        """
+        result = {}
+        slots = sorted(self.unchosen)
+        start = 0
+        for end in range(1, len(slots) + 1):
+            if end < len(slots) and slots[end] == slots[end - 1] + 1:
+                continue
+            run = slots[start:end]
+            values = [self.unchosen[slot] for slot in run]
+            result.update(zip(run, await self.propose_batch(values, acceptors, quorum, first_slot=run[0])))
+            start = end
+        return result
+
+    def propose_batch_sync(self, values: List[Any], acceptors: List['Acceptor'],
+                           quorum: Optional[QuorumConfig] = None) -> List[Optional[Any]]:
+        return asyncio.run(self.propose_batch(values, acceptors, quorum))
+
+    async def propose_pipelined(self, batches: List[List[Any]], acceptors: List['Acceptor'],
+                                quorum: Optional[QuorumConfig] = None) -> List[List[Optional[Any]]]:
+        """
+        Run several propose_batch() rounds without waiting for each other.
+
+        With durable acceptors an ACCEPTED reply waits for an fsync. Running
+        the rounds back to back costs (round-trip + fsync) per batch; here
+        batch N+1 sends its PREPARE while batch N's ACCEPT is still being
+        written, so the fsyncs overlap and get group-committed together.
+
+        Safe because propose_batch() claims its log slots and proposal
+        number before its first await, so concurrent rounds never collide.
+        """
+        return list(await asyncio.gather(*(self.propose_batch(b, acceptors, quorum) for b in batches)))
+
+    async def propose_fast(self, value: Any, acceptors: List['Acceptor'],
+                           quorum: Optional[QuorumConfig] = None) -> Optional[Any]:
+        """
+        Try to choose a value in ONE round-trip (Fast Paxos), falling back to classic Paxos.
+        
+        Classic Paxos always pays two round-trips: PREPARE, then ACCEPT.
+        Fast Paxos moves the PREPARE (and the ACCEPT-ANY) to open_fast_round(),
+        which needs no value; the value then goes straight to the acceptors,
+        which accept whatever arrives first in that round.
+        
+        COST IN ROUND-TRIPS:
+        - Round opened ahead of time with open_fast_round(): 1
+        - No round open: 2 to open it here + 1 = 3, strictly slower than
+          propose(). Open the round before the value is known to gain anything
+        - A fast round decides ONE value; it is closed once used, so each
+          value needs its own open_fast_round()
+        
+        STEP-BY-STEP:
+        1. No fast round open yet? Open one (open_fast_round)
+        2. Send ACCEPT(fast round, value) to all acceptors - no Phase 1
+        3. Need a FAST quorum (ceil(3N/4)), larger than a majority: it must
+           still overlap any other quorum even when values collide
+        4. Either way the fast round is now spent. Not enough accepts
+           (collision, failures, or the value is already decided)? Run a
+           classic round, which adopts any value that may already be chosen
+        
+        Returns:
+            The chosen value, or None if even the classic fallback failed
+        """
+        if quorum is None:
+            quorum = QuorumConfig.for_size(len(acceptors))
+
+        if self._fast_round is None and not await self.open_fast_round(acceptors, quorum):
+            logger.debug("   ↩️  %s: Fast round unavailable, using classic Paxos", self.name)
+            return await self.propose(value, acceptors, quorum)
+
+        proposal_num = self._fast_round
+        self._fast_round = None  # Single-decree: this round is used up whatever the outcome
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("⚡ %s: Fast ACCEPT((%d.%d), '%s') | Fast quorum needed: %s/%s",
+                         self.name, *unpack_pn(proposal_num), value, quorum.fast_quorum, quorum.size)
+        accepts = await self._await_quorum(
+            (acceptor.accept_fast_async(proposal_num, value) for acceptor in acceptors),
+            quorum.fast_quorum)
+
+        if len(accepts) >= quorum.fast_quorum:
+            logger.debug("   🎉 FAST CONSENSUS: '%s' chosen in one round-trip (%s/%s accepts)",
+                         value, len(accepts), quorum.size)
+            return value
+
+        logger.debug("   ↩️  FAST ROUND FAILED: Only %s/%s accepts, recovering with classic Paxos",
+                     len(accepts), quorum.fast_quorum)
+        return await self.propose(value, acceptors, quorum)
+
+    def propose_fast_sync(self, value: Any, acceptors: List['Acceptor'],
+                          quorum: Optional[QuorumConfig] = None) -> Optional[Any]:
+        return asyncio.run(self.propose_fast(value, acceptors, quorum))
+
+    async def open_fast_round(self, acceptors: List['Acceptor'],
+                              quorum: Optional[QuorumConfig] = None) -> bool:
+        """
+        Open a fast round: Phase 1 with an even proposal number, then ACCEPT-ANY.
+        
+        Takes two round-trips but no value, so run it ahead of time (e.g.
+        while waiting for the next client request); the following
+        propose_fast() then needs a single round-trip.
+        
+        Only possible while the promises report no previously accepted value
+        (otherwise the value is already constrained and a classic round must
+        carry it), and only if a fast quorum of acceptors enters "any" mode.
+        
+        Returns:
+            True if the round is open and propose_fast() will use it
+        """
+        if quorum is None:
+            quorum = QuorumConfig.for_size(len(acceptors))
+        proposal_num = self._next_proposal_num(fast=True)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("⚡ %s: Opening fast round (%d.%d)", self.name, *unpack_pn(proposal_num))
+
+        promises = await self._await_quorum(
+            (acceptor.prepare_async(proposal_num) for acceptor in acceptors), quorum.majority)
+        if len(promises) < quorum.majority:
+            return False
+        if any(promise.prev_accepted is not None for promise in promises):
+            return False
+
+        granted = await self._await_quorum(
+            (acceptor.accept_any_async(proposal_num) for acceptor in acceptors), quorum.fast_quorum)
+        if len(granted) < quorum.fast_quorum:
+            return False
+
+        self._fast_round = proposal_num
+        return True
+
+class PaxosConstraint:
+    """
+    THE PAXOS CONSTRAINT, APPLIED ONE PROMISE AT A TIME
+    ===================================================
+    
+    PAXOS SAFETY RULE:
+    If any acceptor in Phase 1 returns a previously accepted value,
+    the proposer MUST use the value from the highest-numbered proposal.
+    
+    This rule ensures that:
+    1. Once a value starts being accepted, all future proposals use that value
+    2. No two different values can ever be chosen
+    3. The system maintains consistency even with concurrent proposers
+    
+    WHY THIS RULE EXISTS:
+    Without this rule, two proposers could choose different values:
+    - Proposer A gets promises, proposes "Value X"  
+    - Proposer B gets promises, proposes "Value Y"
+    - Result: Inconsistent state!
+    
+    WITH this rule:
+    - Proposer A gets promises, proposes "Value X", some acceptors accept
+    - Proposer B gets promises, learns about "Value X", must propose "Value X"  
+    - Result: Consistent state - both chose "Value X"
+    
+    STEP-BY-STEP:
+    1. Start from the proposer's own value, with no highest proposal seen
+    2. observe() each PROMISE as it arrives (Proposer._await_quorum calls it),
+       keeping a running max of the previously accepted proposal numbers
+    3. value() returns the value of that highest proposal, or the original
+       value if no acceptor reported one
+    
+    Keeping the running max while replies are still in flight means the
+    promise list is never walked a second time after the quorum is reached.
+    """
+    __slots__ = ('original_value', 'highest_proposal_num', 'highest_accepted_values')
+
+    def __init__(self, original_value: Any):
+        self.original_value = original_value
+        self.highest_proposal_num = -1
+        self.highest_accepted_values = []
+
+    def observe(self, promise: Promise) -> None:
+        if promise.prev_accepted is None:
+            return
+        prev_proposal_num, prev_value = promise.prev_accepted
+        if prev_proposal_num > self.highest_proposal_num:
+            self.highest_proposal_num = prev_proposal_num
+            self.highest_accepted_values = [prev_value]
+        elif prev_proposal_num == self.highest_proposal_num:
+            self.highest_accepted_values.append(prev_value)
+
+    def value(self) -> Any:
+        """The value that must be used in Phase 2 (may differ from the original)."""
+        if not self.highest_accepted_values:
             # No previous values exist, can use our original proposal
-            return original_value
+            return self.original_value
+        values = self.highest_accepted_values
+        if len(values) == 1 or (self.highest_proposal_num >> NODE_ID_BITS) & 1:
+            # A classic (odd) round carries exactly one value: every report agrees
+            return values[0]
+
+        # Several reports from the same fast (even) round, where values may have
+        # collided: the one reported most often is the only one that can have
+        # reached a fast quorum. Tallied by equality, not hashing, so values
+        # need not be hashable (e.g. lists).
+        best_value, best_count = values[0], 0
+        for candidate in values:
+            count = sum(1 for value in values if value == candidate)
+            if count > best_count:
+                best_value, best_count = candidate, count
+        return best_value
 
 class Acceptor:
     """
@@ -281,6 +699,9 @@ class Acceptor:
     - highest_prepare: Highest proposal number this acceptor has promised to
     - accepted: The proposal (number, value) this acceptor has accepted
     - name: Human-readable name for logging
+    - slot_promises / slot_accepted: The same two pieces of state per log
+      slot, used by the batched Multi-Paxos calls (prepare_range, accept_batch)
+    - fast_round: Fast round this acceptor is in "any" mode for (accept_any)
     
     PAXOS RULES FOR ACCEPTORS:
     
@@ -305,13 +726,19 @@ class Acceptor:
     only the latest proposer can get acceptance.
     """
 
+    __slots__ = ('node_id', 'name', 'highest_prepare', 'accepted', 'slot_promises', 'slot_accepted',
+                 'fast_round')
+
     def __init__(self, node_id: int, name: str = ""):
         self.node_id = node_id
         self.name = name or f"Acceptor-{node_id}"
         self.highest_prepare = None  # Highest proposal number promised to
         self.accepted = None         # (proposal_num, value) currently accepted
+        self.slot_promises: Dict[int, int] = {}  # slot -> highest promise
+        self.slot_accepted: Dict[int, Tuple[int, Any]] = {}  # slot -> (num, value)
+        self.fast_round = None       # Fast round open for direct proposals, if any
 
-    def prepare(self, proposal_num: ProposalNumber) -> Optional[Message]:
+    def prepare(self, proposal_num: int) -> Optional[Promise]:
         """
         Handle PREPARE request (Phase 1b of Paxos).
         
@@ -337,7 +764,10 @@ class Acceptor:
         Returns:
             PROMISE message if accepting, None if rejecting
         """
-        print(f"     📨 {self.name}: Received PREPARE({proposal_num})")
+        # Every PREPARE passes through here; with tracing off, skip building log arguments
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("     📨 %s: Received PREPARE((%d.%d))", self.name, *unpack_pn(proposal_num))
 
         # Check if this proposal number is higher than any we've promised to
         if self.highest_prepare is None or proposal_num > self.highest_prepare:
@@ -345,27 +775,29 @@ class Acceptor:
             old_promise = self.highest_prepare
             self.highest_prepare = proposal_num
 
-            print(f"     📝 {self.name}: PROMISE granted to {proposal_num}")
-            if old_promise:
-                print(f"        Previous promise was to {old_promise}")
+            if debug:
+                logger.debug("     📝 %s: PROMISE granted to (%d.%d)", self.name, *unpack_pn(proposal_num))
+            if debug and old_promise is not None:
+                logger.debug("        Previous promise was to (%d.%d)", *unpack_pn(old_promise))
 
             # Include any previously accepted value in the response
             # This is crucial for the Paxos constraint
             prev_accepted = None
             if self.accepted:
                 prev_proposal_num, prev_value = self.accepted
-                prev_accepted = (prev_proposal_num.seq, prev_value)
-                print(f"        Returning previously accepted: {prev_proposal_num} -> '{prev_value}'")
+                prev_accepted = (prev_proposal_num, prev_value)
+                if debug:
+                    logger.debug("        Returning previously accepted: (%d.%d) -> '%s'", *unpack_pn(prev_proposal_num), prev_value)
 
-            return Message("PROMISE", self.node_id, 0, proposal_num.seq,
-                           prev_accepted=prev_accepted)
+            return Promise(self.node_id, prev_accepted)
         else:
             # Reject - already promised to a higher numbered proposal
-            print(f"     ❌ {self.name}: REJECT PREPARE {proposal_num}")
-            print(f"        Reason: Already promised to higher number {self.highest_prepare}")
+            if debug:
+                logger.debug("     ❌ %s: REJECT PREPARE (%d.%d)", self.name, *unpack_pn(proposal_num))
+                logger.debug("        Reason: Already promised to higher number (%d.%d)", *unpack_pn(self.highest_prepare))
             return None
 
-    def accept(self, proposal_num: ProposalNumber, value: Any) -> Optional[Message]:
+    def accept(self, proposal_num: int, value: Any) -> Optional[Accepted]:
         """
         Handle ACCEPT request (Phase 2b of Paxos).
         
@@ -399,26 +831,337 @@ class Acceptor:
         Returns:
             ACCEPTED message if accepting, None if rejecting
         """
-        print(f"     📨 {self.name}: Received ACCEPT({proposal_num}, '{value}')")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("     📨 %s: Received ACCEPT((%d.%d), '%s')", self.name, *unpack_pn(proposal_num), value)
 
         # Check if this proposal violates our promise
         if self.highest_prepare is None or proposal_num >= self.highest_prepare:
             # Accept the proposal - doesn't violate any promises
+            if type(value) is str:
+                # One shared object per distinct string value (e.g. a leader name),
+                # however many copies arrive off the wire or from log replay
+                value = sys.intern(value)
             old_accepted = self.accepted
             self.accepted = (proposal_num, value)
 
-            print(f"     ✅ {self.name}: ACCEPTED '{value}' with proposal {proposal_num}")
-            if old_accepted:
+            if debug:
+                logger.debug("     ✅ %s: ACCEPTED '%s' with proposal (%d.%d)", self.name, value, *unpack_pn(proposal_num))
+            if debug and old_accepted:
                 old_num, old_val = old_accepted
-                print(f"        Previous acceptance: {old_num} -> '{old_val}'")
+                logger.debug("        Previous acceptance: (%d.%d) -> '%s'", *unpack_pn(old_num), old_val)
 
-            return Message("ACCEPTED", self.node_id, 0, proposal_num.seq, value)
+            return Accepted(self.node_id, value)
         else:
             # Reject - would violate our promise  
-            print(f"     ❌ {self.name}: REJECT ACCEPT {proposal_num}")
-            print(f"        Reason: Would violate promise to {self.highest_prepare}")
+            if debug:
+                logger.debug("     ❌ %s: REJECT ACCEPT (%d.%d)", self.name, *unpack_pn(proposal_num))
+                logger.debug("        Reason: Would violate promise to (%d.%d)", *unpack_pn(self.highest_prepare))
             return None
 
+    def prepare_range(self, proposal_num: int, lo: int, hi: int) -> Optional[Promise]:
+        """
+        Handle a batched PREPARE for log slots [lo, hi) (Multi-Paxos Phase 1b).
+        
+        Same rule as prepare(), applied to every slot at once: the promise is
+        granted only if proposal_num is higher than the promise held for each
+        slot in the range (all or nothing). The PROMISE carries every value
+        already accepted in the range as {slot: (proposal_num, value)}.
+        """
+        promised = self.slot_promises
+        for slot in range(lo, hi):
+            current = promised.get(slot)
+            if current is not None and not proposal_num > current:
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("     ❌ %s: REJECT PREPARE (%d.%d) for slots [%s, %s)",
+                                 self.name, *unpack_pn(proposal_num), lo, hi)
+                    logger.debug("        Reason: Slot %s already promised to (%d.%d)", slot, *unpack_pn(current))
+                return None
+
+        prev_accepted = {}
+        for slot in range(lo, hi):
+            promised[slot] = proposal_num
+            if slot in self.slot_accepted:
+                prev_num, prev_value = self.slot_accepted[slot]
+                prev_accepted[slot] = (prev_num, prev_value)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("     📝 %s: PROMISE granted to (%d.%d) for slots [%s, %s)",
+                         self.name, *unpack_pn(proposal_num), lo, hi)
+        return Promise(self.node_id, prev_accepted)
+
+    def accept_batch(self, proposal_num: int,
+                     slot_values: List[Tuple[int, Any]]) -> Optional[Accepted]:
+        """
+        Handle a batched ACCEPT carrying many (slot, value) pairs (Multi-Paxos Phase 2b).
+        
+        Each slot follows the accept() rule on its own promise. The single
+        ACCEPTED reply is a bitmask: bit i set means slot_values[i] was accepted.
+        Returns None if no slot could be accepted.
+        """
+        promised = self.slot_promises
+        accepted = self.slot_accepted
+        mask = 0
+        for offset, (slot, value) in enumerate(slot_values):
+            current = promised.get(slot)
+            if current is None or proposal_num >= current:
+                accepted[slot] = (proposal_num, value)
+                mask |= 1 << offset
+
+        if not mask:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("     ❌ %s: REJECT ACCEPT (%d.%d) for %s slots",
+                             self.name, *unpack_pn(proposal_num), len(slot_values))
+            return None
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("     ✅ %s: ACCEPTED %d/%d slots with proposal (%d.%d)",
+                         self.name, bin(mask).count('1'), len(slot_values), *unpack_pn(proposal_num))
+        return Accepted(self.node_id, mask)
+
+    def accept_any(self, proposal_num: int) -> bool:
+        """
+        Handle ACCEPT-ANY for a fast round (Fast Paxos Phase 2a "any").
+        
+        Instead of a value, the coordinator tells the acceptor: "in round N,
+        accept the first value any proposer sends you directly". Granted under
+        the same rule as accept(): N must not be below our promise.
+        """
+        if self.highest_prepare is None or proposal_num >= self.highest_prepare:
+            self.highest_prepare = proposal_num
+            self.fast_round = proposal_num
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("     ⚡ %s: ANY mode for fast round (%d.%d)", self.name, *unpack_pn(proposal_num))
+            return True
+        return False
+
+    def accept_fast(self, proposal_num: int, value: Any) -> Optional[Accepted]:
+        """
+        Handle a direct proposal in a fast round (Fast Paxos Phase 2b).
+        
+        Accepted only if proposal_num is the fast round we are in "any" mode
+        for, no higher promise has been made since, and we have not already
+        accepted a value in this round - one value per acceptor per round.
+        """
+        if (proposal_num == self.fast_round and proposal_num >= self.highest_prepare
+                and (self.accepted is None or self.accepted[0] != proposal_num)):
+            self.accepted = (proposal_num, value)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("     ✅ %s: FAST ACCEPTED '%s' in round (%d.%d)", self.name, value, *unpack_pn(proposal_num))
+            return Accepted(self.node_id, value)
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("     ❌ %s: REJECT FAST ACCEPT (%d.%d)", self.name, *unpack_pn(proposal_num))
+        return None
+
+    # Async entry points used by the Proposer. This in-process acceptor
+    # answers immediately; a networked acceptor would override these with the
+    # actual RPC so the proposer can wait on all replies concurrently.
+    async def prepare_async(self, proposal_num: int) -> Optional[Promise]:
+        return self.prepare(proposal_num)
+
+    async def accept_async(self, proposal_num: int, value: Any) -> Optional[Accepted]:
+        return self.accept(proposal_num, value)
+
+    async def prepare_range_async(self, proposal_num: int, lo: int, hi: int) -> Optional[Promise]:
+        return self.prepare_range(proposal_num, lo, hi)
+
+    async def accept_batch_async(self, proposal_num: int,
+                                 slot_values: List[Tuple[int, Any]]) -> Optional[Accepted]:
+        return self.accept_batch(proposal_num, slot_values)
+
+    async def accept_any_async(self, proposal_num: int) -> bool:
+        return self.accept_any(proposal_num)
+
+    async def accept_fast_async(self, proposal_num: int, value: Any) -> Optional[Accepted]:
+        return self.accept_fast(proposal_num, value)
+
+class PersistentAcceptor(Acceptor):
+    """
+    DURABLE ACCEPTOR WITH GROUP COMMIT
+    ==================================
+    
+    A real acceptor must not forget its promises or accepted values when it
+    crashes: it has to write them to disk *before* replying. Doing one fsync
+    per message caps an acceptor at a few hundred messages per second.
+    
+    GROUP COMMIT:
+    1. Each granted PREPARE/ACCEPT is applied in memory and appended to a
+       pending list; its reply is held back on a future
+    2. A background flusher waits GROUP_COMMIT_DELAY so that concurrent
+       requests can join, then writes ALL pending records at once and
+       fsyncs ONCE (in a worker thread, so the event loop keeps accepting)
+    3. Every held-back reply is released together
+    
+    One fsync is amortized over the whole batch, and a reply still never
+    leaves before its record is durable. Records are written in arrival
+    order, so a reply that depends on an earlier state change is never
+    durable before that change.
+    
+    LOG FORMAT / RECOVERY:
+    Append-only JSON lines, one granted operation per line: [method, args].
+    On startup the log is replayed through the same methods, which rebuilds
+    the exact state. A chosen value must never change, so a request is
+    rejected, before it touches any state, unless its record decodes back
+    to exactly the same arguments: not JSON-serializable at all (a set), or
+    not preserved by JSON (a tuple comes back as a list, {1: 'a'} as
+    {'1': 'a'}). A crash in the middle of a write leaves a torn last line;
+    recovery drops it, since its reply was never sent.
+    
+    FAIL-STOP:
+    If a group commit fails (disk error, log closed), memory may already
+    hold state the disk does not. The acceptor then stops answering: every
+    pending and later request gets no reply, and nothing more is appended
+    after the possibly partial write. Restart it to recover from the log.
+    
+    Call `await close()` to finish the group commit in flight before the
+    log is closed.
+    """
+
+    # Seconds the flusher waits for more requests to join a batch
+    GROUP_COMMIT_DELAY = 0.0002
+
+    __slots__ = ('log_path', '_log', '_pending', '_flusher', '_failed')
+
+    def __init__(self, node_id: int, log_path: str, name: str = ""):
+        super().__init__(node_id, name)
+        self.log_path = log_path
+        self._pending = []    # (encoded record, future, reply) awaiting the next group commit
+        self._flusher = None  # Background flush task while a batch is open
+        self._failed = None   # Exception that stopped the log (see FAIL-STOP)
+        self._replay()
+        self._log = open(log_path, 'ab')
+
+    def _replay(self) -> None:
+        """Rebuild promises and accepted values by re-applying the logged operations."""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb') as log:
+            data = log.read()
+
+        records = []
+        good_end = 0  # Byte offset just past the last complete record
+        for line in data.splitlines(keepends=True):
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("record has no line terminator")
+                if line.strip():
+                    records.append(json.loads(line))
+            except ValueError:
+                if good_end + len(line) < len(data):
+                    raise  # Damage before the tail is not a torn write: refuse to guess
+                # Torn last record from a crash mid-write: its reply never left,
+                # so drop it and let new records start on a clean line
+                logger.warning("     💾 %s: Dropping incomplete last record (%s bytes)", self.name, len(line))
+                with open(self.log_path, 'r+b') as log:
+                    log.truncate(good_end)
+                break
+            good_end += len(line)
+
+        for method, args in records:
+            getattr(self, method)(*args)
+        logger.debug("     💾 %s: Recovered state from %s records", self.name, len(records))
+
+    def _begin(self, method: str, args: list) -> asyncio.Future:
+        """
+        Apply an operation in memory and stage its record for the next group commit.
+        
+        The record is encoded first: if the arguments cannot be logged, the
+        request is rejected without changing any state. Returns a future
+        that resolves to the reply once the record is durable (immediately
+        for rejections, which need no record). Only the awaiting request
+        waits: the event loop keeps serving other rounds, whose records
+        join the same group commit (see Proposer.propose_pipelined).
+        """
+        loop = asyncio.get_running_loop()
+        durable_reply = loop.create_future()
+        if self._failed is not None or self._log.closed:
+            durable_reply.set_result(None)
+            return durable_reply
+        try:
+            record = (json.dumps([method, args]) + "\n").encode()
+            if json.loads(record) != [method, args]:
+                raise ValueError("arguments do not survive a JSON round-trip")
+        except (TypeError, ValueError) as exc:
+            logger.warning("     ❌ %s: REJECT %s, record cannot be logged: %s", self.name, method, exc)
+            durable_reply.set_result(None)
+            return durable_reply
+
+        reply = getattr(self, method)(*args)
+        if not reply:
+            durable_reply.set_result(reply)
+            return durable_reply
+
+        self._pending.append((record, durable_reply, reply))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = loop.create_task(self._flush())
+        return durable_reply
+
+    async def _persist(self, method: str, args: list) -> Any:
+        """Apply an operation, holding its reply back until the record is fsynced."""
+        return await self._begin(method, args)
+
+    async def _flush(self) -> None:
+        """Group commit: one write + one fsync for everything pending, repeated until drained."""
+        await asyncio.sleep(self.GROUP_COMMIT_DELAY)
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await loop.run_in_executor(None, self._write_and_sync, b"".join(rec for rec, _, _ in batch))
+            except Exception as exc:
+                # Fail-stop: memory is ahead of the disk now, and the log may end
+                # in a partial record. Answer nothing, append nothing more.
+                self._failed = exc
+                logger.warning("     💥 %s: Log write failed, acceptor stopped: %r", self.name, exc)
+                for _, done, _ in batch + self._pending:
+                    if not done.done():
+                        done.set_result(None)
+                self._pending = []
+                return
+            else:
+                # A waiter may have been cancelled meanwhile (the proposer already
+                # had its quorum); its record is still written, it just gets no reply
+                for _, done, reply in batch:
+                    if not done.done():
+                        done.set_result(reply)
+
+    def _write_and_sync(self, data: bytes) -> None:
+        self._log.write(data)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+
+    async def close(self) -> None:
+        """Let the group commit in flight finish, write anything left over, close the log."""
+        if self._flusher is not None and not self._flusher.done():
+            await self._flusher
+        if self._pending and self._failed is None:
+            # Only left behind if the flusher was cancelled with its event loop;
+            # those replies never left, but memory already reflects them
+            self._write_and_sync(b"".join(rec for rec, _, _ in self._pending))
+            self._pending = []
+        self._log.close()
+
+    async def prepare_async(self, proposal_num: int) -> Optional[Promise]:
+        return await self._persist('prepare', [proposal_num])
+
+    async def accept_async(self, proposal_num: int, value: Any) -> Optional[Accepted]:
+        return await self._persist('accept', [proposal_num, value])
+
+    async def prepare_range_async(self, proposal_num: int, lo: int, hi: int) -> Optional[Promise]:
+        return await self._persist('prepare_range', [proposal_num, lo, hi])
+
+    async def accept_batch_async(self, proposal_num: int,
+                                 slot_values: List[Tuple[int, Any]]) -> Optional[Accepted]:
+        # Pairs as lists: that is how JSON hands them back on replay
+        return await self._persist('accept_batch', [proposal_num, [[slot, value] for slot, value in slot_values]])
+
+    async def accept_any_async(self, proposal_num: int) -> bool:
+        return await self._persist('accept_any', [proposal_num])
+
+    async def accept_fast_async(self, proposal_num: int, value: Any) -> Optional[Accepted]:
+        return await self._persist('accept_fast', [proposal_num, value])
+
 class Learner:
     """
     LEARNER ROLE IN PAXOS ALGORITHM
@@ -447,9 +1190,12 @@ class Learner:
     - Monitoring systems learning about system state changes
     """
 
+    __slots__ = ('node_id', 'values', 'value_counts')
+
     def __init__(self, node_id: int):
         self.node_id = node_id
         self.values = {}  # acceptor_id -> accepted_value mapping
+        self.value_counts = Counter()  # accepted_value -> number of acceptors, kept in step with values
 
     def learn(self, acceptor_id: int, value: Any):
         """
@@ -457,11 +1203,26 @@ class Learner:
         
         In a real implementation, acceptors would actively notify learners
         whenever they accept a proposal. This simulates that notification.
+        
+        The per-value tally is updated here, incrementally, so get_consensus()
+        never has to recount every acceptor.
         """
+        if type(value) is str:
+            # Equal names reported by different acceptors become one object, so
+            # tally lookups hit on identity before ever comparing characters
+            value = sys.intern(value)
+        counts = self.value_counts
+        if acceptor_id in self.values:
+            # The acceptor moved on to a newer value: withdraw its old vote
+            old_value = self.values[acceptor_id]
+            counts[old_value] -= 1
+            if not counts[old_value]:
+                del counts[old_value]
         self.values[acceptor_id] = value
-        print(f"📚 Learner-{self.node_id}: Learned Acceptor-{acceptor_id} accepted '{value}'")
+        counts[value] += 1
+        logger.debug("📚 Learner-%s: Learned Acceptor-%s accepted '%s'", self.node_id, acceptor_id, value)
 
-    def get_consensus(self, total_acceptors: int) -> Optional[Any]:
+    def get_consensus(self, quorum: Union[QuorumConfig, int]) -> Optional[Any]:
         """
         Determine if consensus has been achieved.
         
@@ -473,32 +1234,29 @@ class Learner:
         3. The system has reached a consistent state
         
         Args:
-            total_acceptors: Total number of acceptors in the system
+            quorum: The cluster's QuorumConfig (or just the total number of
+                acceptors, from which one is derived)
             
         Returns:
             The consensus value if achieved, None if no consensus yet
         """
-        if not self.values:
+        if not self.value_counts:
             return None
+        if not isinstance(quorum, QuorumConfig):
+            quorum = QuorumConfig.for_size(quorum)
 
-        # Count how many acceptors accepted each value
-        value_counts = {}
-        for acceptor_id, value in self.values.items():
-            if value in value_counts:
-                value_counts[value] += 1
-            else:
-                value_counts[value] = 1
-
-        majority_threshold = total_acceptors // 2 + 1
+        majority_threshold = quorum.majority
 
-        # Check if any value has majority support
-        for value, count in value_counts.items():
-            if count >= majority_threshold:
-                print(f"🎓 Learner-{self.node_id}: CONSENSUS DETECTED!")
-                print(f"   Value: '{value}' accepted by {count}/{total_acceptors} acceptors")
-                return value
+        # Only the most-voted value can possibly have majority support
+        value, count = self.value_counts.most_common(1)[0]
+        if count >= majority_threshold:
+            logger.debug("🎓 Learner-%s: CONSENSUS DETECTED!", self.node_id)
+            logger.debug("   Value: '%s' accepted by %s/%s acceptors", value, count, quorum.size)
+            return value
 
-        print(f"📊 Learner-{self.node_id}: No consensus yet. Vote counts: {value_counts}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Copying the tally costs O(distinct values); only pay it when tracing
+            logger.debug("📊 Learner-%s: No consensus yet. Vote counts: %s", self.node_id, dict(self.value_counts))
         return None
 
 # === REALISTIC PAXOS DEMONSTRATIONS ===
@@ -528,9 +1286,12 @@ def demo_database_leader_election():
 
     learner = Learner(20)
 
+    # Quorum sizes are fixed by the cluster: compute them once, reuse every round
+    quorum = QuorumConfig.for_size(len(coordinators))
+
     print(f"📊 CLUSTER SETUP:")
     print(f"   Candidates: MySQL-Primary-East, MySQL-Primary-West")
-    print(f"   Coordinators: {len(coordinators)} nodes (majority = {len(coordinators)//2 + 1})")
+    print(f"   Coordinators: {quorum.size} nodes (majority = {quorum.majority})")
     print(f"   Safety requirement: Only ONE leader can be elected")
     print()
 
@@ -538,14 +1299,14 @@ def demo_database_leader_election():
     print("=" * 60)
     print("ELECTION ROUND 1: MySQL-Primary-East campaigns for leadership")
     print("=" * 60)
-    elected_leader1 = db_node_east.propose("MySQL-Primary-East", coordinators)
+    elected_leader1 = db_node_east.propose_sync("MySQL-Primary-East", coordinators, quorum)
 
     print()
     print("=" * 60)
     print("ELECTION ROUND 2: MySQL-Primary-West challenges for leadership")
     print("=" * 60)
     print("⚠️  CRITICAL TEST: Will Paxos prevent split-brain scenario?")
-    elected_leader2 = db_node_west.propose("MySQL-Primary-West", coordinators)
+    elected_leader2 = db_node_west.propose_sync("MySQL-Primary-West", coordinators, quorum)
 
     # Update learner and show results
     for coordinator in coordinators:
@@ -553,7 +1314,7 @@ def demo_database_leader_election():
             _, accepted_value = coordinator.accepted
             learner.learn(coordinator.node_id, accepted_value)
 
-    consensus_leader = learner.get_consensus(len(coordinators))
+    consensus_leader = learner.get_consensus(quorum)
 
     print()
     print("🏆 ELECTION RESULTS:")
@@ -621,4 +1382,9 @@ REAL-WORLD APPLICATIONS:
     print("="*80)
 
 if __name__ == "__main__":
+    # Show the protocol trace: route this module's DEBUG records to stdout as plain lines
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
     run_complete_paxos_demo()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The algorithms are standalone scripts, not a package: import them by path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "algorithms"))
@@ -0,0 +1,88 @@
+import pytest
+
+from consistent_hashing import ConsistentHashing
+
+SERVERS = ["Server_A", "Server_B", "Server_C", "Server_D"]
+KEYS = [f"user_{i}" for i in range(2000)]
+
+
+def tiny_hash(key):
+    """A deliberately bad hash with 16 positions, so virtual nodes collide."""
+    return sum(key.encode()) % 16
+
+
+@pytest.fixture(params=[None, tiny_hash], ids=["blake2b", "colliding"])
+def hash_fn(request):
+    return request.param
+
+
+def owners(ring):
+    return [ring.get_node(key) for key in KEYS]
+
+
+def test_bulk_add_builds_the_same_ring_as_add_node(hash_fn):
+    bulk = ConsistentHashing(SERVERS, replicas=20, hash_fn=hash_fn)
+    one_by_one = ConsistentHashing(replicas=20, hash_fn=hash_fn)
+    for server in SERVERS:
+        one_by_one.add_node(server)
+    assert bulk.sorted_hashes == one_by_one.sorted_hashes
+    assert bulk.sorted_owners == one_by_one.sorted_owners
+
+
+def test_ring_after_add_and_remove_equals_fresh_ring(hash_fn):
+    ring = ConsistentHashing(SERVERS, replicas=20, hash_fn=hash_fn)
+    ring.add_node("Server_E")
+    ring.remove_node("Server_B")  # walks past other nodes' colliding positions
+    fresh = ConsistentHashing(["Server_A", "Server_C", "Server_D", "Server_E"], replicas=20, hash_fn=hash_fn)
+    assert ring.sorted_hashes == fresh.sorted_hashes
+    assert ring.sorted_owners == fresh.sorted_owners
+    assert owners(ring) == owners(fresh)
+
+
+def test_all_lookup_paths_agree(hash_fn):
+    ring = ConsistentHashing(SERVERS, replicas=20, hash_fn=hash_fn)
+    expected = owners(ring)
+    assert ring.get_nodes_batch(KEYS) == expected
+    assignments = ring.get_nodes_for_keys(KEYS)
+    assert [assignments[key] for key in KEYS] == expected
+    frozen = ring.freeze()
+    assert [frozen(key) for key in KEYS] == expected
+
+
+@pytest.mark.parametrize("change", [
+    lambda ring: ring.add_node("Server_E"),
+    lambda ring: ring.add_nodes_bulk(["Server_E", "Server_F"]),
+    lambda ring: ring.remove_node("Server_A"),
+], ids=["add_node", "add_nodes_bulk", "remove_node"])
+def test_topology_change_invalidates_lookup_cache(change):
+    ring = ConsistentHashing(SERVERS, replicas=20)
+    owners(ring)  # warm the cache
+    change(ring)
+    assert not ring._lookup_cache
+    fresh = ConsistentHashing(sorted(ring.nodes), replicas=20)
+    assert owners(ring) == owners(fresh)
+
+
+def test_lookup_cache_keeps_most_recent_keys(monkeypatch):
+    monkeypatch.setattr(ConsistentHashing, "LOOKUP_CACHE_SIZE", 3)
+    ring = ConsistentHashing(SERVERS, replicas=20)
+    for key in ["a", "b", "c", "a", "d"]:
+        ring.get_node(key)
+    assert list(ring._lookup_cache) == ["c", "a", "d"]
+
+
+def test_freeze_is_a_snapshot():
+    ring = ConsistentHashing(SERVERS, replicas=20)
+    before = owners(ring)
+    frozen = ring.freeze()
+    ring.remove_node("Server_A")
+    ring.add_node("Server_E")
+    assert [frozen(key) for key in KEYS] == before
+    assert owners(ring) != before
+
+
+def test_empty_ring_has_no_owner():
+    ring = ConsistentHashing()
+    assert ring.get_node("key") is None
+    assert ring.get_nodes_batch(["key"]) == [None]
+    assert ring.freeze()("key") is None
@@ -0,0 +1,249 @@
+import asyncio
+import time
+
+from paxos import (Acceptor, PaxosConstraint, PersistentAcceptor, Promise, Proposer, QuorumConfig,
+                   pack_pn)
+
+
+def make_acceptors(n=5):
+    return [Acceptor(i) for i in range(n)]
+
+
+def test_repeat_proposal_of_unhashable_value():
+    acceptors = make_acceptors()
+    proposer = Proposer(1)
+    assert proposer.propose_sync(['db1', 'db2'], acceptors) == ['db1', 'db2']
+    # Phase 1 of the second round reports the list from a majority of acceptors
+    assert proposer.propose_sync(['db1', 'db2'], acceptors) == ['db1', 'db2']
+
+
+def test_constraint_picks_most_reported_value_of_fast_round():
+    fast_pn = pack_pn(2, 1)
+    constraint = PaxosConstraint('mine')
+    for prev in [(fast_pn, ['a']), (fast_pn, ['b']), (fast_pn, ['b']), (pack_pn(1, 3), ['z']), None]:
+        constraint.observe(Promise(0, prev))
+    assert constraint.value() == ['b']
+
+
+def test_fast_round_opened_ahead_decides_in_one_round():
+    acceptors = make_acceptors()
+    proposer = Proposer(1)
+    assert asyncio.run(proposer.open_fast_round(acceptors))
+    fast_pn = proposer._fast_round
+    assert proposer.propose_fast_sync('fast', acceptors) == 'fast'
+    assert all(acceptor.accepted == (fast_pn, 'fast') for acceptor in acceptors)
+    assert proposer._fast_round is None  # a fast round decides a single value
+
+
+def test_fast_collision_recovers_with_classic_round():
+    acceptors = make_acceptors()
+    proposer = Proposer(1)
+    assert asyncio.run(proposer.open_fast_round(acceptors))
+    # Another client's value reaches two acceptors first: 3/5 is below the fast quorum of 4
+    for acceptor in acceptors[:2]:
+        acceptor.accept_fast(proposer._fast_round, 'other')
+    assert proposer.propose_fast_sync('mine', acceptors) == 'mine'
+    assert sum(acceptor.accepted[1] == 'mine' for acceptor in acceptors) >= 3
+
+
+def test_fast_falls_back_to_classic_once_value_is_decided():
+    acceptors = make_acceptors()
+    assert Proposer(1).propose_sync('first', acceptors) == 'first'
+    # The fast round cannot open over an accepted value; the classic fallback adopts it
+    assert Proposer(2).propose_fast_sync('second', acceptors) == 'first'
+
+
+def make_persistent(tmp_path, n=3):
+    return [PersistentAcceptor(i, str(tmp_path / f"acceptor-{i}.log")) for i in range(n)]
+
+
+async def propose_and_close(proposer, value, acceptors):
+    chosen = await proposer.propose(value, acceptors)
+    for acceptor in acceptors:
+        await acceptor.close()
+    return chosen
+
+
+def test_persistent_acceptor_replays_its_log(tmp_path):
+    acceptors = make_persistent(tmp_path)
+    assert asyncio.run(propose_and_close(Proposer(1), 'leader-a', acceptors)) == 'leader-a'
+
+    recovered = make_persistent(tmp_path)
+    for before, after in zip(acceptors, recovered):
+        assert after.highest_prepare == before.highest_prepare
+        assert after.accepted == before.accepted
+    # The recovered cluster still enforces the decision
+    assert asyncio.run(propose_and_close(Proposer(2), 'leader-b', recovered)) == 'leader-a'
+
+
+def test_persistent_acceptor_drops_torn_last_record(tmp_path):
+    acceptors = make_persistent(tmp_path)
+    asyncio.run(propose_and_close(Proposer(1), 'leader-a', acceptors))
+    with open(acceptors[0].log_path, 'ab') as log:
+        log.write(b'["accept", [99')  # crash in the middle of a write
+
+    recovered = PersistentAcceptor(0, acceptors[0].log_path)
+    assert recovered.accepted == acceptors[0].accepted
+    asyncio.run(recovered.close())
+    with open(acceptors[0].log_path, 'rb') as log:
+        assert log.read().endswith(b"\n")
+
+
+def test_persistent_acceptor_rejects_unloggable_value(tmp_path):
+    acceptors = make_persistent(tmp_path)
+    assert asyncio.run(propose_and_close(Proposer(1), {1, 2}, acceptors)) is None
+    assert all(acceptor.accepted is None for acceptor in acceptors)
+
+
+def test_persistent_acceptor_rejects_values_json_would_change(tmp_path):
+    # A tuple would come back as a list, int dict keys as strings: the
+    # chosen value would differ after a restart
+    for value in [('a', 1), {1: 'a'}]:
+        log_dir = tmp_path / type(value).__name__
+        log_dir.mkdir()
+        acceptors = make_persistent(log_dir)
+        assert asyncio.run(propose_and_close(Proposer(1), value, acceptors)) is None
+        assert all(acceptor.accepted is None for acceptor in acceptors)
+
+
+def test_persistent_acceptor_batch_survives_restart(tmp_path):
+    acceptors = make_persistent(tmp_path)
+
+    async def run():
+        chosen = await Proposer(1).propose_batch(['a', ['b', 1]], acceptors)
+        for acceptor in acceptors:
+            await acceptor.close()
+        return chosen
+
+    assert asyncio.run(run()) == ['a', ['b', 1]]
+    assert make_persistent(tmp_path)[0].slot_accepted == acceptors[0].slot_accepted
+
+
+class BrokenDiskAcceptor(PersistentAcceptor):
+    def _write_and_sync(self, data):
+        raise OSError("disk gone")
+
+
+def test_persistent_acceptor_stops_after_failed_write(tmp_path):
+    acceptors = [BrokenDiskAcceptor(i, str(tmp_path / f"acceptor-{i}.log")) for i in range(2)]
+    acceptors.append(PersistentAcceptor(2, str(tmp_path / "acceptor-2.log")))
+
+    async def run():
+        first = await Proposer(1).propose('a', acceptors)
+        # A failed acceptor answers nothing afterwards, and at once
+        second = await acceptors[0].prepare_async(pack_pn(9, 2))
+        return first, second
+
+    assert asyncio.run(run()) == (None, None)
+    asyncio.run(acceptors[2].close())
+
+
+def test_persistent_acceptor_rejects_requests_after_close(tmp_path):
+    acceptor = make_persistent(tmp_path, n=1)[0]
+
+    async def run():
+        await acceptor.close()
+        return await acceptor.prepare_async(pack_pn(1, 1))
+
+    assert asyncio.run(run()) is None
+
+
+def test_quorum_sizes():
+    assert QuorumConfig.for_size(1) == QuorumConfig(1, 1, 1)
+    assert QuorumConfig.for_size(3) == QuorumConfig(3, 2, 3)
+    assert QuorumConfig.for_size(4) == QuorumConfig(4, 3, 3)
+    assert QuorumConfig.for_size(5) == QuorumConfig(5, 3, 4)
+    assert QuorumConfig.for_size(7) == QuorumConfig(7, 4, 6)
+
+
+def test_accept_batch_replies_with_bitmask_of_accepted_slots():
+    acceptor = Acceptor(0)
+    acceptor.prepare_range(pack_pn(1, 1), 0, 4)
+    acceptor.prepare_range(pack_pn(3, 2), 1, 2)  # slot 1 now promised higher
+    reply = acceptor.accept_batch(pack_pn(1, 1), [(0, 'a'), (1, 'b'), (2, 'c'), (3, 'd')])
+    assert reply.value == 0b1101
+    assert 1 not in acceptor.slot_accepted
+    assert acceptor.accept_batch(pack_pn(1, 1), [(1, 'b')]) is None
+
+
+def test_propose_batch_keeps_previously_accepted_slot_values():
+    acceptors = make_acceptors()
+    # Slot 1 already carries a value accepted by a majority
+    for acceptor in acceptors[:3]:
+        acceptor.prepare_range(pack_pn(1, 9), 1, 2)
+        acceptor.accept_batch(pack_pn(1, 9), [(1, 'earlier')])
+    proposer = Proposer(1)
+    proposer.seq = 2
+    assert proposer.propose_batch_sync(['x', 'y', 'z'], acceptors) == ['x', 'earlier', 'z']
+    assert proposer.next_slot == 3
+
+
+class CountingAcceptor(PersistentAcceptor):
+    def __init__(self, *args):
+        self.syncs = 0
+        super().__init__(*args)
+
+    def _write_and_sync(self, data):
+        self.syncs += 1
+        super()._write_and_sync(data)
+
+
+def test_propose_pipelined_commits_every_batch_with_shared_fsyncs(tmp_path):
+    acceptors = [CountingAcceptor(i, str(tmp_path / f"acceptor-{i}.log")) for i in range(3)]
+    batches = [[f"v{b}-{i}" for i in range(5)] for b in range(20)]
+
+    async def run():
+        chosen = await Proposer(1).propose_pipelined(batches, acceptors)
+        for acceptor in acceptors:
+            await acceptor.close()
+        return chosen
+
+    assert asyncio.run(run()) == batches
+    # 20 PREPAREs + 20 ACCEPTs per acceptor, far fewer fsyncs
+    assert all(acceptor.syncs < 10 for acceptor in acceptors)
+    recovered = PersistentAcceptor(0, acceptors[0].log_path)
+    assert len(recovered.slot_accepted) == 100
+
+
+def test_failed_batch_slots_stay_open_until_retried():
+    acceptors = make_acceptors(3)
+    # A competing proposer holds slot 1 on two acceptors and got 'x' accepted on one
+    for acceptor in acceptors[:2]:
+        acceptor.prepare_range(pack_pn(5, 9), 1, 2)
+    acceptors[0].accept_batch(pack_pn(5, 9), [(1, 'x')])
+
+    proposer = Proposer(1)
+    assert proposer.propose_batch_sync(['a', 'b', 'c'], acceptors) == [None, None, None]
+    assert proposer.unchosen == {0: 'a', 1: 'b', 2: 'c'}
+    assert proposer.next_slot == 3  # the hole is not handed out again
+
+    proposer.seq = 6  # outrank the competitor
+    assert asyncio.run(proposer.retry_unchosen(acceptors)) == {0: 'a', 1: 'x', 2: 'c'}
+    assert proposer.unchosen == {}
+
+
+class SlowAcceptor(Acceptor):
+    async def prepare_async(self, proposal_num):
+        await asyncio.sleep(60)
+        return self.prepare(proposal_num)
+
+
+class UnreachableAcceptor(Acceptor):
+    async def prepare_async(self, proposal_num):
+        raise ConnectionError("acceptor unreachable")
+
+
+def test_round_commits_on_early_quorum_despite_slow_and_unreachable_acceptors(monkeypatch):
+    monkeypatch.setattr(Proposer, 'ROUND_TIMEOUT', 5.0)
+    acceptors = [SlowAcceptor(0), UnreachableAcceptor(1), Acceptor(2), Acceptor(3), Acceptor(4)]
+    started = time.monotonic()
+    assert Proposer(1).propose_sync('v', acceptors) == 'v'
+    assert time.monotonic() - started < 1.0  # did not wait for the slow acceptor
+
+
+def test_phase_without_live_majority_times_out(monkeypatch):
+    monkeypatch.setattr(Proposer, 'ROUND_TIMEOUT', 0.2)
+    acceptors = [SlowAcceptor(0), SlowAcceptor(1), UnreachableAcceptor(2), Acceptor(3), Acceptor(4)]
+    started = time.monotonic()
+    assert Proposer(1).propose_sync('v', acceptors) is None
+    assert time.monotonic() - started < 1.0